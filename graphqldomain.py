@@ -1,5 +1,13 @@
 """A GraphQL domain for Sphinx."""
+
+import collections
+import functools
+import heapq
+import operator
 from typing import (
+    Any,
+    Callable,
+    DefaultDict,
     Dict,
     Iterable,
     Iterator,
@@ -9,6 +17,8 @@ from typing import (
     Sequence,
     Tuple,
     Type,
+    Union,
+    cast,
 )
 
 from docutils import nodes
@@ -54,6 +64,49 @@ class ObjectEntry(NamedTuple):
     """
 
 
+_SIGNATURE_PARSERS: Dict[str, Tuple[Optional[str], Callable[[Parser], object]]] = {
+    "directive": ("directive", Parser.parse_directive_definition),
+    "enum": ("enum", Parser.parse_enum_type_definition),
+    "enum:value": (None, Parser.parse_enum_value_definition),
+    "field": (None, Parser.parse_field_definition),
+    "input": ("input", Parser.parse_input_object_type_definition),
+    "input:field": (None, Parser.parse_input_value_def),
+    "interface": ("interface", Parser.parse_interface_type_definition),
+    "scalar": ("scalar", Parser.parse_scalar_type_definition),
+    "schema": (None, Parser.parse_const_directives),
+    "type": ("type", Parser.parse_object_type_definition),
+    "union": ("union", Parser.parse_union_type_definition),
+}
+"""The keyword that a signature of each kind starts with, and how to parse it.
+
+Users give signatures without the keyword,
+so it is added before parsing and rendered as an annotation.
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse(kind: str, sig: str) -> object:
+    """Parse a signature into its GraphQL AST.
+
+    The same signatures are commonly parsed many times in a build,
+    so the results are cached.
+    The returned nodes are shared between callers and must not be modified.
+
+    The cache lasts for the lifetime of the process only.
+    Sphinx does not reread unchanged documents on incremental builds,
+    so storing parsed signatures in the environment would add to the cost
+    of saving and loading the environment without avoiding any parsing.
+    """
+    keyword, parse = _SIGNATURE_PARSERS[kind]
+    parser = Parser(f"{keyword} {sig}" if keyword else sig, no_location=True)
+    # The parse methods start from the current token, which is SOF until consumed
+    parser.expect_token(TokenKind.SOF)
+    node = parse(parser)
+    # Reject anything left over after the definition
+    parser.expect_token(TokenKind.EOF)
+    return node
+
+
 class OperationTypeField(TypedField):
     def make_field(
         self,
@@ -156,6 +209,13 @@ def type_to_xref(
     return xref
 
 
+def keyword_annotation(keyword: str) -> addnodes.desc_annotation:
+    """Create the annotation for the keyword that starts a definition."""
+    return addnodes.desc_annotation(
+        f"{keyword} ", "", nodes.Text(keyword), addnodes.desc_sig_space()
+    )
+
+
 class GQLObject(ObjectDescription[Tuple[str, Optional[str]]]):
     """The base class for any GraphQL type."""
 
@@ -171,6 +231,25 @@ class GQLObject(ObjectDescription[Tuple[str, Optional[str]]]):
     :attr:`GQLDomain.initial_data` and :attr:`GQLDomain.object_types`.
     """
     parent_type: Optional[str] = None
+    signature_kind: str
+    """The kind of signature that the object is described with.
+
+    This must be a key in :data:`_SIGNATURE_PARSERS`.
+    """
+
+    _context_key: str
+    """The reference context key that holds the name of this object."""
+    _parent_context_key: str
+    """The reference context key that holds the name of the parent object."""
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Base classes do not set an obj_type
+        obj_type = getattr(cls, "obj_type", None)
+        if obj_type:
+            cls._context_key = f"gql:{obj_type}"
+        if cls.parent_type:
+            cls._parent_context_key = f"gql:{cls.parent_type}"
 
     def add_target_and_index(
         self, name: Tuple[str, Optional[str]], sig: str, signode: desc_signature
@@ -179,143 +258,201 @@ class GQLObject(ObjectDescription[Tuple[str, Optional[str]]]):
 
         signode["ids"].append(node_id)
         if "noindex" not in self.options:
-            self.env.domaindata["gql"][self.obj_type][
-                signode["fullname"]
-            ] = ObjectEntry(
-                self.env.docname,
-                node_id,
-            )
+            domain = cast("GraphQLDomain", self.env.get_domain("gql"))
+            domain.note_object(self.obj_type, node_id, self.env.docname)
+
+    def handle_signature(
+        self, sig: str, signode: desc_signature
+    ) -> Tuple[str, Optional[str]]:
+        node: Any = _parse(self.signature_kind, sig)
+        children: List[Node] = []
+
+        keyword, _ = _SIGNATURE_PARSERS[self.signature_kind]
+        if keyword:
+            children.append(keyword_annotation(keyword))
+
+        name = node.name.value
+        self._handle_signature_name(children, name)
+        self._handle_signature_body(children, node)
+
+        signode.extend(children)
+        return self._resolve_names(name, signode)
+
+    def _handle_signature_name(self, children: List[Node], name: str) -> None:
+        children.append(addnodes.desc_name(name, name))
+
+    def _handle_signature_body(self, children: List[Node], node: Any) -> None:
+        """Render everything in the signature that comes after the name.
+
+        By default only the directives of the object are rendered.
+        """
+        if node.directives:
+            self._handle_signature_directives(children, node.directives)
 
     def _handle_signature_directives(
-        self, signode: desc_signature, ast_nodes: Sequence[gql_ast.ConstDirectiveNode]
+        self, children: List[Node], ast_nodes: Sequence[gql_ast.ConstDirectiveNode]
     ) -> None:
         for directive_node in ast_nodes:
-            signode += addnodes.desc_sig_space()
+            children.append(addnodes.desc_sig_space())
 
-            signode += addnodes.desc_sig_operator("", "@")
+            children.append(addnodes.desc_sig_operator("", "@"))
             directive_name = directive_node.name.value
-            signode += type_to_xref(directive_name, self.env, reftype="directive")
+            children.append(type_to_xref(directive_name, self.env, reftype="directive"))
 
-            self._handle_signature_const_arguments(signode, directive_node.arguments)
+            if directive_node.arguments:
+                self._handle_signature_const_arguments(
+                    children, directive_node.arguments
+                )
 
     def _handle_signature_const_arguments(
-        self, signode: desc_signature, ast_nodes: Sequence[gql_ast.ConstArgumentNode]
+        self, children: List[Node], ast_nodes: Sequence[gql_ast.ConstArgumentNode]
     ) -> None:
-        if not ast_nodes:
-            return
-
-        signode += addnodes.desc_sig_operator("", "(")
+        children.append(addnodes.desc_sig_operator("", "("))
 
         for i, argument_node in enumerate(ast_nodes):
             if i != 0:
-                signode += addnodes.desc_sig_punctuation("", ",")
-                signode += addnodes.desc_sig_space()
+                children.append(addnodes.desc_sig_punctuation("", ","))
+                children.append(addnodes.desc_sig_space())
 
-            signode += addnodes.desc_sig_name("", argument_node.name.value)
-            signode += addnodes.desc_sig_punctuation("", ":")
-            signode += addnodes.desc_sig_space()
-            self._handle_signature_literal(signode, argument_node.value)
+            children.append(addnodes.desc_sig_name("", argument_node.name.value))
+            children.append(addnodes.desc_sig_punctuation("", ":"))
+            children.append(addnodes.desc_sig_space())
+            self._handle_signature_literal(children, argument_node.value)
 
-        signode += addnodes.desc_sig_operator("", ")")
+        children.append(addnodes.desc_sig_operator("", ")"))
 
     def _handle_signature_input_values(
         self,
-        signode: desc_signature,
+        children: List[Node],
         ast_nodes: Sequence[gql_ast.InputValueDefinitionNode],
     ) -> None:
-        if not ast_nodes:
-            return
-
-        signode += addnodes.desc_sig_operator("", "(")
+        children.append(addnodes.desc_sig_operator("", "("))
 
         for i, argument_node in enumerate(ast_nodes):
             if i != 0:
-                signode += addnodes.desc_sig_punctuation("", ",")
-                signode += addnodes.desc_sig_space()
-
-            signode += addnodes.desc_sig_name("", argument_node.name.value)
-            signode += addnodes.desc_sig_punctuation("", ":")
-            signode += addnodes.desc_sig_space()
-            self._handle_signature_type_reference(signode, argument_node.type)
-            self._handle_signature_default_value(signode, argument_node.default_value)
-            self._handle_signature_directives(signode, argument_node.directives)
+                children.append(addnodes.desc_sig_punctuation("", ","))
+                children.append(addnodes.desc_sig_space())
+
+            children.append(addnodes.desc_sig_name("", argument_node.name.value))
+            children.append(addnodes.desc_sig_punctuation("", ":"))
+            children.append(addnodes.desc_sig_space())
+            self._handle_signature_type_reference(children, argument_node.type)
+            if argument_node.default_value:
+                self._handle_signature_default_value(
+                    children, argument_node.default_value
+                )
+            if argument_node.directives:
+                self._handle_signature_directives(children, argument_node.directives)
 
-        signode += addnodes.desc_sig_operator("", ")")
+        children.append(addnodes.desc_sig_operator("", ")"))
 
     def _handle_signature_default_value(
-        self, signode: desc_signature, ast_nodes: Optional[gql_ast.ConstValueNode]
+        self, children: List[Node], ast_nodes: gql_ast.ConstValueNode
     ) -> None:
-        if not ast_nodes:
-            return
-
-        signode += addnodes.desc_sig_space()
-        signode += addnodes.desc_sig_operator("", "=")
-        signode += addnodes.desc_sig_space()
+        children.append(addnodes.desc_sig_space())
+        children.append(addnodes.desc_sig_operator("", "="))
+        children.append(addnodes.desc_sig_space())
 
-        self._handle_signature_literal(signode, ast_nodes)
+        self._handle_signature_literal(children, ast_nodes)
 
     def _handle_signature_literal(
-        self, signode: desc_signature, ast_nodes: Optional[gql_ast.ConstValueNode]
+        self, children: List[Node], ast_nodes: Optional[gql_ast.ConstValueNode]
     ) -> None:
-        if isinstance(ast_nodes, gql_ast.ListValueNode):
-            signode += addnodes.desc_sig_operator("", "[")
-            for i, item_node in enumerate(ast_nodes.values):
-                if i != 0:
-                    signode += addnodes.desc_sig_punctuation("", ",")
-                    signode += addnodes.desc_sig_space()
+        method_name = _LITERAL_HANDLERS.get(type(ast_nodes))
+        # Variable values are a valid literal but not in schemas
+        if method_name is None:
+            raise TypeError(f"Unknown literal node type '{type(ast_nodes)}'")
 
-                self._handle_signature_literal(signode, item_node)
+        getattr(self, method_name)(children, ast_nodes)
 
-            signode += addnodes.desc_sig_operator("", "]")
+    def _handle_signature_list_literal(
+        self, children: List[Node], ast_node: gql_ast.ConstListValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_operator("", "["))
+        for i, item_node in enumerate(ast_node.values):
+            if i != 0:
+                children.append(addnodes.desc_sig_punctuation("", ","))
+                children.append(addnodes.desc_sig_space())
 
-        elif isinstance(ast_nodes, gql_ast.ObjectValueNode):
-            signode += addnodes.desc_sig_operator("", "{")
-            for i, field_node in enumerate(ast_nodes.fields):
-                if i != 0:
-                    signode += addnodes.desc_sig_punctuation("", ",")
-                    signode += addnodes.desc_sig_space()
-
-                signode += addnodes.desc_sig_name("", field_node.name.value)
-                signode += addnodes.desc_sig_punctuation("", ":")
-                signode += addnodes.desc_sig_space()
-                self._handle_signature_literal(signode, field_node.value)
-
-            signode += addnodes.desc_sig_operator("", "}")
-
-        elif isinstance(ast_nodes, (gql_ast.IntValueNode, gql_ast.FloatValueNode)):
-            signode += addnodes.desc_sig_literal_number("", ast_nodes.value)
-        elif isinstance(ast_nodes, gql_ast.StringValueNode):
-            signode += addnodes.desc_sig_operator("", '"')
-            signode += addnodes.desc_sig_literal_string("", ast_nodes.value)
-            signode += addnodes.desc_sig_operator("", '"')
-        elif isinstance(ast_nodes, gql_ast.BooleanValueNode):
-            signode += addnodes.desc_sig_keyword("", str(ast_nodes.value).lower())
-        elif isinstance(ast_nodes, gql_ast.NullValueNode):
-            signode += addnodes.desc_sig_keyword("", "null")
-        elif isinstance(ast_nodes, gql_ast.EnumValueNode):
-            signode += addnodes.desc_sig_name("", ast_nodes.value)
-        # Variable values are a valid literal but not in schemas
-        else:
-            raise TypeError(f"Unknown literal node type '{type(ast_nodes)}'")
+            self._handle_signature_literal(children, item_node)
+
+        children.append(addnodes.desc_sig_operator("", "]"))
+
+    def _handle_signature_object_literal(
+        self, children: List[Node], ast_node: gql_ast.ConstObjectValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_operator("", "{"))
+        for i, field_node in enumerate(ast_node.fields):
+            if i != 0:
+                children.append(addnodes.desc_sig_punctuation("", ","))
+                children.append(addnodes.desc_sig_space())
+
+            children.append(addnodes.desc_sig_name("", field_node.name.value))
+            children.append(addnodes.desc_sig_punctuation("", ":"))
+            children.append(addnodes.desc_sig_space())
+            self._handle_signature_literal(children, field_node.value)
+
+        children.append(addnodes.desc_sig_operator("", "}"))
+
+    def _handle_signature_number_literal(
+        self,
+        children: List[Node],
+        ast_node: Union[gql_ast.IntValueNode, gql_ast.FloatValueNode],
+    ) -> None:
+        children.append(addnodes.desc_sig_literal_number("", ast_node.value))
+
+    def _handle_signature_string_literal(
+        self, children: List[Node], ast_node: gql_ast.StringValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_operator("", '"'))
+        children.append(addnodes.desc_sig_literal_string("", ast_node.value))
+        children.append(addnodes.desc_sig_operator("", '"'))
+
+    def _handle_signature_boolean_literal(
+        self, children: List[Node], ast_node: gql_ast.BooleanValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_keyword("", str(ast_node.value).lower()))
+
+    def _handle_signature_null_literal(
+        self, children: List[Node], ast_node: gql_ast.NullValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_keyword("", "null"))
+
+    def _handle_signature_enum_literal(
+        self, children: List[Node], ast_node: gql_ast.EnumValueNode
+    ) -> None:
+        children.append(addnodes.desc_sig_name("", ast_node.value))
 
     def _handle_signature_type_reference(
         self,
-        signode: desc_signature,
+        children: List[Node],
         ast_node: gql_ast.TypeNode,
     ) -> None:
-        if isinstance(ast_node, gql_ast.NamedTypeNode):
-            type_name = ast_node.name.value
-            signode += type_to_xref(type_name, self.env)
-        elif isinstance(ast_node, gql_ast.NonNullTypeNode):
-            self._handle_signature_type_reference(signode, ast_node.type)
-            signode += addnodes.desc_sig_operator("", "!")
-        elif isinstance(ast_node, gql_ast.ListTypeNode):
-            signode += addnodes.desc_sig_operator("", "[")
-            self._handle_signature_type_reference(signode, ast_node.type)
-            signode += addnodes.desc_sig_operator("", "]")
-        else:
+        method_name = _TYPE_REFERENCE_HANDLERS.get(type(ast_node))
+        if method_name is None:
             raise TypeError(f"Unknown type node '{type(ast_node)}")
 
+        getattr(self, method_name)(children, ast_node)
+
+    def _handle_signature_named_type(
+        self, children: List[Node], ast_node: gql_ast.NamedTypeNode
+    ) -> None:
+        type_name = ast_node.name.value
+        children.append(type_to_xref(type_name, self.env))
+
+    def _handle_signature_non_null_type(
+        self, children: List[Node], ast_node: gql_ast.NonNullTypeNode
+    ) -> None:
+        self._handle_signature_type_reference(children, ast_node.type)
+        children.append(addnodes.desc_sig_operator("", "!"))
+
+    def _handle_signature_list_type(
+        self, children: List[Node], ast_node: gql_ast.ListTypeNode
+    ) -> None:
+        children.append(addnodes.desc_sig_operator("", "["))
+        self._handle_signature_type_reference(children, ast_node.type)
+        children.append(addnodes.desc_sig_operator("", "]"))
+
     def _resolve_names(
         self, name: str, signode: desc_signature
     ) -> Tuple[str, Optional[str]]:
@@ -334,6 +471,31 @@ class GQLObject(ObjectDescription[Tuple[str, Optional[str]]]):
         return (fullname, parent_name)
 
 
+_LITERAL_HANDLERS: Dict[type, str] = {
+    gql_ast.ListValueNode: "_handle_signature_list_literal",
+    gql_ast.ConstListValueNode: "_handle_signature_list_literal",
+    gql_ast.ObjectValueNode: "_handle_signature_object_literal",
+    gql_ast.ConstObjectValueNode: "_handle_signature_object_literal",
+    gql_ast.IntValueNode: "_handle_signature_number_literal",
+    gql_ast.FloatValueNode: "_handle_signature_number_literal",
+    gql_ast.StringValueNode: "_handle_signature_string_literal",
+    gql_ast.BooleanValueNode: "_handle_signature_boolean_literal",
+    gql_ast.NullValueNode: "_handle_signature_null_literal",
+    gql_ast.EnumValueNode: "_handle_signature_enum_literal",
+}
+"""The name of the method that renders each type of literal value node.
+
+Methods are looked up by name so that subclasses can override them.
+"""
+
+_TYPE_REFERENCE_HANDLERS: Dict[type, str] = {
+    gql_ast.NamedTypeNode: "_handle_signature_named_type",
+    gql_ast.NonNullTypeNode: "_handle_signature_non_null_type",
+    gql_ast.ListTypeNode: "_handle_signature_list_type",
+}
+"""The name of the method that renders each type of type reference node."""
+
+
 class GQLParentObject(GQLObject):
     """A base class for any GraphQL types that can have child entities."""
 
@@ -344,11 +506,11 @@ class GQLParentObject(GQLObject):
             # GraphQL entities can only have on level of nesting,
             # so we only need to set and unset the context
             # rather than needing to maintain a stack.
-            self.env.ref_context[f"gql:{self.obj_type}"] = fullname
+            self.env.ref_context[self._context_key] = fullname
 
     def after_content(self) -> None:
         """Unset the domain context."""
-        self.env.ref_context[f"gql:{self.obj_type}"] = None
+        self.env.ref_context[self._context_key] = None
 
 
 class GQLChildObject(GQLObject):
@@ -365,7 +527,7 @@ class GQLChildObject(GQLObject):
     def _resolve_names(
         self, name: str, signode: desc_signature
     ) -> Tuple[str, Optional[str]]:
-        parent_name = self.env.ref_context.get(f"gql:{self.parent_type}")
+        parent_name = self.env.ref_context.get(self._parent_context_key)
         if parent_name:
             fullname = f"{parent_name}.{name}"
         else:
@@ -381,6 +543,7 @@ class GQLField(GQLChildObject):
         https://spec.graphql.org/June2018/#FieldDefinition
     """
 
+    signature_kind = "field"
     doc_field_types = [
         GroupedField(
             "argument",
@@ -389,27 +552,19 @@ class GQLField(GQLChildObject):
         ),
     ]
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        parser = Parser(sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_field_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_input_values(signode, node.arguments)
-
-        signode += addnodes.desc_sig_operator("", ":")
-        signode += addnodes.desc_sig_space()
+    def _handle_signature_body(
+        self, children: List[Node], node: gql_ast.FieldDefinitionNode
+    ) -> None:
+        if node.arguments:
+            self._handle_signature_input_values(children, node.arguments)
 
-        self._handle_signature_type_reference(signode, node.type)
+        children.append(addnodes.desc_sig_operator("", ":"))
+        children.append(addnodes.desc_sig_space())
 
-        self._handle_signature_directives(signode, node.directives)
+        self._handle_signature_type_reference(children, node.type)
 
-        return self._resolve_names(name, signode)
+        if node.directives:
+            self._handle_signature_directives(children, node.directives)
 
 
 class GQLDirective(GQLObject):
@@ -420,6 +575,7 @@ class GQLDirective(GQLObject):
     """
 
     obj_type = "directive"
+    signature_kind = "directive"
     doc_field_types = [
         GroupedField(
             "argument",
@@ -428,38 +584,28 @@ class GQLDirective(GQLObject):
         ),
     ]
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#sec-Type-System.Directives
-        parser = Parser("directive " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_directive_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("directive"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-        signode += addnodes.desc_sig_space()
-        signode += addnodes.desc_sig_operator("", "@")
+    def _handle_signature_name(self, children: List[Node], name: str) -> None:
+        children.append(addnodes.desc_sig_space())
+        children.append(addnodes.desc_sig_operator("", "@"))
+        super()._handle_signature_name(children, name)
 
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_input_values(signode, node.arguments)
+    def _handle_signature_body(
+        self, children: List[Node], node: gql_ast.DirectiveDefinitionNode
+    ) -> None:
+        if node.arguments:
+            self._handle_signature_input_values(children, node.arguments)
 
-        signode += addnodes.desc_sig_space()
-        signode += addnodes.desc_sig_keyword("", "on")
-        signode += addnodes.desc_sig_space()
+        children.append(addnodes.desc_sig_space())
+        children.append(addnodes.desc_sig_keyword("", "on"))
+        children.append(addnodes.desc_sig_space())
 
         for i, location in enumerate(node.locations):
             if i != 0:
-                signode += addnodes.desc_sig_space()
-                signode += addnodes.desc_sig_operator("", "|")
-                signode += addnodes.desc_sig_space()
+                children.append(addnodes.desc_sig_space())
+                children.append(addnodes.desc_sig_operator("", "|"))
+                children.append(addnodes.desc_sig_space())
 
-            signode += nodes.Text(location.value)
-
-        return self._resolve_names(name, signode)
+            children.append(nodes.Text(location.value))
 
 
 class GQLEnum(GQLParentObject):
@@ -470,25 +616,7 @@ class GQLEnum(GQLParentObject):
     """
 
     obj_type = "enum"
-
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#sec-Interfaces
-        parser = Parser("enum " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_enum_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("enum"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
-
-        return self._resolve_names(name, signode)
+    signature_kind = "enum"
 
 
 class GQLEnumValue(GQLChildObject):
@@ -499,24 +627,9 @@ class GQLEnumValue(GQLChildObject):
     """
 
     obj_type = "enum:value"
+    signature_kind = "enum:value"
     parent_type = "enum"
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#EnumValueDefinition
-        parser = Parser(sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_enum_value_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
-
-        return self._resolve_names(name, signode)
-
 
 class GQLInput(GQLParentObject):
     """Represents the definition of a GraphQL Input Object.
@@ -526,25 +639,7 @@ class GQLInput(GQLParentObject):
     """
 
     obj_type = "input"
-
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#sec-Input-Objects
-        parser = Parser("input " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_input_object_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("input"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
-
-        return self._resolve_names(name, signode)
+    signature_kind = "input"
 
 
 class GQLInputField(GQLChildObject):
@@ -555,29 +650,22 @@ class GQLInputField(GQLChildObject):
     """
 
     obj_type = "input:field"
+    signature_kind = "input:field"
     parent_type = "input"
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        parser = Parser(sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_input_value_def()
-        parser.expect_token(TokenKind.EOF)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        signode += addnodes.desc_sig_operator("", ":")
-        signode += addnodes.desc_sig_space()
-
-        self._handle_signature_type_reference(signode, node.type)
+    def _handle_signature_body(
+        self, children: List[Node], node: gql_ast.InputValueDefinitionNode
+    ) -> None:
+        children.append(addnodes.desc_sig_operator("", ":"))
+        children.append(addnodes.desc_sig_space())
 
-        self._handle_signature_default_value(signode, node.default_value)
+        self._handle_signature_type_reference(children, node.type)
 
-        self._handle_signature_directives(signode, node.directives)
+        if node.default_value:
+            self._handle_signature_default_value(children, node.default_value)
 
-        return self._resolve_names(name, signode)
+        if node.directives:
+            self._handle_signature_directives(children, node.directives)
 
 
 class GQLInterface(GQLParentObject):
@@ -588,25 +676,7 @@ class GQLInterface(GQLParentObject):
     """
 
     obj_type = "interface"
-
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#sec-Interfaces
-        parser = Parser("interface " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_interface_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("interface"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
-
-        return self._resolve_names(name, signode)
+    signature_kind = "interface"
 
 
 class GQLInterfaceField(GQLField):
@@ -628,24 +698,7 @@ class GQLScalar(GQLObject):
     """
 
     obj_type = "scalar"
-
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        parser = Parser("scalar " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_scalar_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("scalar"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
-
-        return self._resolve_names(name, signode)
+    signature_kind = "scalar"
 
 
 class GQLSchema(GQLParentObject):
@@ -681,17 +734,20 @@ class GQLSchema(GQLParentObject):
     def handle_signature(
         self, sig: str, signode: desc_signature
     ) -> Tuple[str, Optional[str]]:
-        prefix = [nodes.Text("schema"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
+        children: List[Node] = []
+
+        children.append(keyword_annotation("schema"))
 
         directives = sig
         if directives:
-            parser = Parser(directives, no_location=True)
-            parser.expect_token(TokenKind.SOF)
-            directive_nodes = parser.parse_const_directives()
-            parser.expect_token(TokenKind.EOF)
+            directive_nodes = cast(
+                List[gql_ast.ConstDirectiveNode], _parse("schema", directives)
+            )
+
+            if directive_nodes:
+                self._handle_signature_directives(children, directive_nodes)
 
-            self._handle_signature_directives(signode, directive_nodes)
+        signode.extend(children)
 
         name = self.options.get("name", DEFAULT_SCHEMA_NAME)
         signode["fullname"] = name
@@ -706,39 +762,29 @@ class GQLType(GQLParentObject):
     """
 
     obj_type = "type"
+    signature_kind = "type"
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        # https://spec.graphql.org/June2018/#sec-Objects
-        parser = Parser("type " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_object_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("type"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
+    def _handle_signature_body(
+        self, children: List[Node], node: gql_ast.ObjectTypeDefinitionNode
+    ) -> None:
         interfaces = node.interfaces
         if interfaces:
-            signode += addnodes.desc_sig_space()
-            signode += addnodes.desc_sig_keyword("", "implements")
-            signode += addnodes.desc_sig_space()
+            children.append(addnodes.desc_sig_space())
+            children.append(addnodes.desc_sig_keyword("", "implements"))
+            children.append(addnodes.desc_sig_space())
             for i, interface in enumerate(interfaces):
                 if i != 0:
-                    signode += addnodes.desc_sig_space()
-                    signode += addnodes.desc_sig_operator("", "&")
-                    signode += addnodes.desc_sig_space()
+                    children.append(addnodes.desc_sig_space())
+                    children.append(addnodes.desc_sig_operator("", "&"))
+                    children.append(addnodes.desc_sig_space())
 
                 interface_type = interface.name.value
-                signode += type_to_xref(interface_type, self.env, reftype="interface")
-
-        self._handle_signature_directives(signode, node.directives)
+                children.append(
+                    type_to_xref(interface_type, self.env, reftype="interface")
+                )
 
-        return self._resolve_names(name, signode)
+        if node.directives:
+            self._handle_signature_directives(children, node.directives)
 
 
 class GQLTypeField(GQLField):
@@ -760,39 +806,28 @@ class GQLUnion(GQLObject):
     """
 
     obj_type = "union"
+    signature_kind = "union"
 
-    def handle_signature(
-        self, sig: str, signode: desc_signature
-    ) -> Tuple[str, Optional[str]]:
-        parser = Parser("union " + sig, no_location=True)
-        parser.expect_token(TokenKind.SOF)
-        node = parser.parse_union_type_definition()
-        parser.expect_token(TokenKind.EOF)
-
-        prefix = [nodes.Text("union"), addnodes.desc_sig_space()]
-        signode += addnodes.desc_annotation(str(prefix), "", *prefix)
-
-        name = node.name.value
-        signode += addnodes.desc_name(name, name)
-
-        self._handle_signature_directives(signode, node.directives)
+    def _handle_signature_body(
+        self, children: List[Node], node: gql_ast.UnionTypeDefinitionNode
+    ) -> None:
+        if node.directives:
+            self._handle_signature_directives(children, node.directives)
 
         member_nodes = node.types
         if member_nodes:
             for i, member_node in enumerate(member_nodes):
                 if i == 0:
-                    signode += addnodes.desc_sig_space()
-                    signode += addnodes.desc_sig_operator("", "=")
-                    signode += addnodes.desc_sig_space()
+                    children.append(addnodes.desc_sig_space())
+                    children.append(addnodes.desc_sig_operator("", "="))
+                    children.append(addnodes.desc_sig_space())
                 else:
-                    signode += addnodes.desc_sig_space()
-                    signode += addnodes.desc_sig_operator("", "|")
-                    signode += addnodes.desc_sig_space()
+                    children.append(addnodes.desc_sig_space())
+                    children.append(addnodes.desc_sig_operator("", "|"))
+                    children.append(addnodes.desc_sig_space())
 
                 member_type = member_node.name.value
-                signode += type_to_xref(member_type, self.env)
-
-        return self._resolve_names(name, signode)
+                children.append(type_to_xref(member_type, self.env))
 
 
 class GraphQLSchemaIndex(Index):
@@ -802,31 +837,23 @@ class GraphQLSchemaIndex(Index):
     localname = "GraphQL Object Index"
     shortname = "index"
 
-    def _anchor(self, fullname: str) -> str:
-        return fullname.lower().split("(", 1)[0]
-
     def generate(
         self, docnames: Optional[Iterable[str]] = None
     ) -> Tuple[List[Tuple[str, List[IndexEntry]]], bool]:
-        content: Dict[str, List[IndexEntry]] = {}
-
-        for fullname, _, objtype, docname, node_id, __ in sorted(
-            self.domain.get_objects()
-        ):
-            # Only index top level objects to eliminate name collisions
-            if objtype in ("enumvalue", "field"):
-                continue
+        content: DefaultDict[str, List[IndexEntry]] = collections.defaultdict(list)
 
+        domain = cast("GraphQLDomain", self.domain)
+        for fullname, _, object_entry in domain.get_objects_for_index():
             name = fullname
             subtype = 0  # Always zero because we don't index child types
-            anchor = node_id
+            docname = object_entry.docname
+            anchor = object_entry.node_id
             extra = ""
             qualifier = ""
             descr = ""
             entry = IndexEntry(name, subtype, docname, anchor, extra, qualifier, descr)
 
-            entries = content.setdefault(fullname[0].lower(), [])
-            entries.append(entry)
+            content[fullname[0].lower()].append(entry)
 
         sorted_content = sorted(content.items())
 
@@ -906,7 +933,7 @@ class GraphQLDomain(Domain):
         "union": GQLXRefRole(),
     }
 
-    initial_data: Dict[str, Dict[str, ObjectEntry]] = {
+    initial_data: Dict[str, Dict[str, Any]] = {
         "directive": {},
         "enum": {},
         "enum:value": {},
@@ -919,16 +946,48 @@ class GraphQLDomain(Domain):
         "type": {},
         "type:field": {},
         "union": {},
+        "_by_doc": {},
     }
+    """The objects declared in the domain.
+
+    Objects are stored by object type, and then by fullname.
+    ``_by_doc`` records the ``(object type, fullname)`` of each object
+    declared in each document, so that a document's objects can be found
+    without searching every object type.
+    """
+    data_version = 1
 
     indices = [GraphQLSchemaIndex]
 
+    def __init__(self, env: BuildEnvironment) -> None:
+        super().__init__(env)
+        self._xref_index: Optional[Dict[str, Tuple[str, ObjectEntry]]] = None
+        """A mapping of the fullname of every object to its type and entry.
+
+        This is built on demand when resolving references
+        and is reset whenever the domain data changes.
+        """
+
+    def note_object(self, object_type: str, fullname: str, docname: str) -> None:
+        """Record an object declared in the given document.
+
+        Args:
+            object_type: The type of the object.
+            fullname: The fully qualified name of the object.
+            docname: The name of the document that declares the object.
+        """
+        self._xref_index = None
+        self.data[object_type][fullname] = ObjectEntry(docname, fullname)
+        self.data["_by_doc"].setdefault(docname, set()).add((object_type, fullname))
+
     def clear_doc(self, docname: str) -> None:
-        for object_type in self.object_types:
+        self._xref_index = None
+        for object_type, fullname in self.data["_by_doc"].pop(docname, ()):
             type_data = self.data[object_type]
-            for fullname, entry in list(type_data.items()):
-                if entry.docname == docname:
-                    del type_data[fullname]
+            entry = type_data.get(fullname)
+            # The object may have since been redeclared in another document
+            if entry and entry.docname == docname:
+                del type_data[fullname]
 
     def resolve_xref(
         self,
@@ -940,35 +999,44 @@ class GraphQLDomain(Domain):
         node: pending_xref,
         contnode: Element,
     ) -> Optional[Element]:
-        patterns = [target]
+        patterns = []
 
         # If the xref was created in the context of the schema,
         # allow references to other names in the schema
         # without needing to specify the name of the schema.
+        # Names in the schema take precedence over top level names.
         schema_name = node.get("gql:schema")
         if schema_name and not target.startswith(f"{schema_name}."):
             patterns.append(f"{schema_name}.{target}")
 
+        patterns.append(target)
+
         # If the xref was created outside the context of the schema,
         # allow references to names in the schema with the default name
         # without needing to use the name of the schema.
         if not schema_name and not target.startswith(f"{DEFAULT_SCHEMA_NAME}."):
             patterns.append(f"{DEFAULT_SCHEMA_NAME}.{target}")
 
-        for object_type in self.object_types:
-            type_data = self.data[object_type]
-            for fullname, entry in list(type_data.items()):
-                if fullname in patterns:
-                    # mypy error caused by incomplete docutils type annotations:
-                    # https://github.com/python/typeshed/issues/1269
-                    return make_refnode(  # type: ignore[no-any-return]
-                        builder,
-                        fromdocname,
-                        entry.docname,
-                        entry.node_id,
-                        [contnode],
-                        fullname,
-                    )
+        if self._xref_index is None:
+            self._xref_index = {}
+            for object_type in self.object_types:
+                for fullname, entry in self.data[object_type].items():
+                    self._xref_index.setdefault(fullname, (object_type, entry))
+
+        for pattern in patterns:
+            hit = self._xref_index.get(pattern)
+            if hit:
+                _, entry = hit
+                # mypy error caused by incomplete docutils type annotations:
+                # https://github.com/python/typeshed/issues/1269
+                return make_refnode(  # type: ignore[no-any-return]
+                    builder,
+                    fromdocname,
+                    entry.docname,
+                    entry.node_id,
+                    [contnode],
+                    pattern,
+                )
 
         return None
 
@@ -993,7 +1061,7 @@ class GraphQLDomain(Domain):
     def get_objects(self) -> Iterator[Tuple[str, str, str, str, str, int]]:
         for object_type in self.object_types:
             type_data = self.data[object_type]
-            for fullname, entry in list(type_data.items()):
+            for fullname, entry in type_data.items():
                 yield (
                     fullname,
                     fullname,
@@ -1005,13 +1073,48 @@ class GraphQLDomain(Domain):
                     1,
                 )
 
+    def get_objects_for_index(self) -> Iterator[Tuple[str, str, ObjectEntry]]:
+        """Get the top level objects in the domain, sorted by fullname.
+
+        Child objects are excluded to eliminate name collisions in the index.
+
+        Returns:
+            The fullname, object type, and entry of each object.
+        """
+        objects_by_type = [
+            self._get_sorted_objects(object_type)
+            for object_type in self.object_types
+            if not issubclass(self.directives[object_type], GQLChildObject)
+        ]
+        return heapq.merge(*objects_by_type, key=operator.itemgetter(0))
+
+    def _get_sorted_objects(
+        self, object_type: str
+    ) -> Iterator[Tuple[str, str, ObjectEntry]]:
+        for fullname, entry in sorted(self.data[object_type].items()):
+            yield (fullname, object_type, entry)
+
     def merge_domaindata(
-        self, docnames: List[str], otherdata: Dict[str, Dict[str, ObjectEntry]]
+        self, docnames: List[str], otherdata: Dict[str, Dict[str, Any]]
     ) -> None:
-        """Merge the data from multiple workers when working in parallel."""
-        for typ, type_data in self.data.items():
-            other_type_data = otherdata[typ]
-            for fullname, other_entry in other_type_data.items():
+        """Merge the data from multiple workers when working in parallel.
+
+        Only the objects declared in the merged documents are visited,
+        so the cost of a merge grows with the work done by the other worker
+        rather than with the size of the whole project.
+        """
+        self._xref_index = None
+        for docname in docnames:
+            keys = otherdata["_by_doc"].get(docname, set())
+            self.data["_by_doc"].setdefault(docname, set()).update(keys)
+
+            for typ, fullname in keys:
+                other_entry = otherdata[typ].get(fullname)
+                # The object may have been redeclared in another document
+                if not other_entry or other_entry.docname != docname:
+                    continue
+
+                type_data = self.data[typ]
                 if fullname in type_data and other_entry != type_data[fullname]:
                     entry = type_data[fullname]
                     other_docname = self.env.doc2path(other_entry[0])
@@ -1,443 +1,661 @@
+import concurrent.futures
+import functools
+import hashlib
+import importlib.metadata
 import os
 import pathlib
-import re
 import shutil
+import sys
 
-import bs4
+import lxml.etree
+import lxml.html
 import pytest
+import sphinx
 from sphinx.application import Sphinx
 
-
-def rebuild(**kwargs) -> None:
+# Find the cross-reference links inside an element
+REFERENCE_LINKS = lxml.etree.XPath(
+    ".//a[contains(concat(' ', normalize-space(@class), ' '), ' reference ')]"
+)
+
+BUILD_SETTINGS = {
+    "buildername": "html",
+    "warningiserror": True,
+    "confoverrides": {"suppress_warnings": ["app"]},
+}
+"""The settings that every test build uses, unless overridden."""
+
+
+def rebuild(
+    srcdir=".",
+    confdir=".",
+    outdir="_build/html",
+    doctreedir="_build/.doctrees",
+    **kwargs,
+) -> None:
     """Build the documentation.
 
-    Documentation is output to ``./_build/html``.
+    By default the documentation in the current directory
+    is output to ``./_build/html``.
     """
     app = Sphinx(
-        srcdir=".",
-        confdir=".",
-        outdir="_build/html",
-        doctreedir="_build/.doctrees",
-        buildername="html",
-        warningiserror=True,
-        confoverrides={"suppress_warnings": ["app"]},
-        **kwargs,
+        srcdir=srcdir,
+        confdir=confdir,
+        outdir=outdir,
+        doctreedir=doctreedir,
+        **{**BUILD_SETTINGS, **kwargs},
     )
     app.build()
 
 
-@pytest.fixture(scope="class")
-def builder(tmp_path_factory):
-    cwd = pathlib.Path.cwd()
+def build_fixture(test_file, dest, **kwargs) -> None:
+    """Build a test fixture into the given directory.
+
+    A build that finishes without any warnings is marked as complete,
+    and is not built again.
+    """
+    complete = dest / "_build" / "complete"
+    if complete.exists():
+        return
+
+    if not (dest / "index.rst").exists():
+        # Preserve the modification time so that Sphinx sees
+        # the source as unchanged on subsequent runs.
+        try:
+            os.link(test_file, dest / "index.rst")
+        except OSError:
+            # Hard links are unsupported across filesystems
+            # and on some platforms.
+            shutil.copy2(test_file, dest / "index.rst")
+    rebuild(
+        srcdir=str(dest),
+        confdir=str(test_file.parent),
+        outdir=str(dest / "_build" / "html"),
+        doctreedir=str(dest / "_build" / ".doctrees"),
+        **kwargs,
+    )
+    complete.touch()
+
+
+@pytest.fixture(scope="session")
+def builder(request, pytestconfig, tmp_path_factory):
+    """Build a test fixture, reusing the output if it has already been built.
+
+    Builds are kept in the pytest cache between runs,
+    keyed on the contents of the fixture, its configuration, the extension,
+    the versions of Sphinx and of the packages that affect the output,
+    and the settings that the fixture is built with.
+    Each Python environment keeps its own builds,
+    and older builds of a fixture in the same environment are removed.
+    Sphinx is not run at all for a fixture that has already built successfully.
+    The cache can be discarded with ``pytest --cache-clear``.
+    Without the pytest cache, each fixture is built into a temporary directory.
+
+    When the tests are not being run by pytest-xdist
+    and enough CPUs are available,
+    the fixtures that the selected tests need are built concurrently up front.
+    Each test class that uses the builder names its fixture
+    with a ``fixture_name`` attribute.
+
+    Returns:
+        The directory that the fixture was built in.
+    """
+    fixtures_dir = (pathlib.Path("tests") / "fixtures").resolve()
+    cache = getattr(pytestconfig, "cache", None)
+    # Separate the builds of each environment, such as each tox environment,
+    # so that they cannot reuse or overwrite each other's builds.
+    environment = hashlib.sha1(f"{sys.prefix}\0{sys.version}".encode()).hexdigest()
+
+    def build_dir(test_name, **kwargs):
+        digest = hashlib.sha1()
+        for path in (
+            fixtures_dir / f"{test_name}.rst",
+            fixtures_dir / "conf.py",
+            pathlib.Path("graphqldomain.py"),
+        ):
+            digest.update(path.read_bytes())
+        digest.update(sphinx.__version__.encode())
+        for package in ("docutils", "furo", "graphql-core"):
+            digest.update(importlib.metadata.version(package).encode())
+        settings = {**BUILD_SETTINGS, **kwargs}
+        digest.update(repr(sorted(settings.items())).encode())
+
+        prefix = f"graphqldomain-{test_name}-{environment[:12]}-"
+        if cache is None:
+            dest = tmp_path_factory.getbasetemp() / (prefix + digest.hexdigest())
+            dest.mkdir(exist_ok=True)
+            return dest
+
+        dest = cache.mkdir(prefix + digest.hexdigest())
+        for stale in dest.parent.glob(f"{prefix}*"):
+            if stale != dest:
+                shutil.rmtree(stale, ignore_errors=True)
+
+        return dest
+
+    if "PYTEST_XDIST_WORKER" not in os.environ:
+        test_names = {
+            item.cls.fixture_name
+            for item in request.session.items
+            if item.cls is not None and "builder" in item.fixturenames
+        }
+        pending = []
+        for test_name in sorted(test_names):
+            # Leave a missing fixture to fail in the tests that use it
+            if not (fixtures_dir / f"{test_name}.rst").exists():
+                continue
+
+            dest = build_dir(test_name)
+            if not (dest / "_build" / "complete").exists():
+                pending.append((fixtures_dir / f"{test_name}.rst", dest))
+
+        # Leave two CPUs free for the rest of the system
+        max_workers = min(len(pending), (os.cpu_count() or 1) - 2)
+        if max_workers > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+                for test_file, dest in pending:
+                    executor.submit(build_fixture, test_file, dest)
+            # Any failed build is left incomplete and is attempted again below,
+            # so that the failure is reported against the tests that use it.
+
+    built = {}
 
     def build(test_name, **kwargs):
-        dest = tmp_path_factory.mktemp(test_name)
-        test_file = pathlib.Path("tests") / "fixtures" / f"{test_name}.rst"
-        shutil.copy(test_file, dest / "index.rst")
-        shutil.copy(pathlib.Path("tests") / "fixtures" / "conf.py", dest)
-        os.chdir(dest)
-        rebuild(**kwargs)
+        if test_name in built:
+            return built[test_name]
+
+        dest = build_dir(test_name, **kwargs)
+        build_fixture(fixtures_dir / f"{test_name}.rst", dest, **kwargs)
 
-    yield build
+        built[test_name] = dest
+        return dest
 
-    os.chdir(cwd)
+    return build
 
 
-def signature_text(soup: bs4.BeautifulSoup):
+class Page:
+    """A built HTML page, with its elements indexed by id.
+
+    Looking up an element by id through lxml searches the whole tree,
+    so the index is built once when the page is parsed.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.root = lxml.html.parse(str(path)).getroot()
+        self.by_id = {}
+        for element in self.root.iterfind(".//*[@id]"):
+            self.by_id.setdefault(element.get("id"), element)
+
+
+@functools.lru_cache(maxsize=None)
+def signature_text(page: Page, element_id: str) -> str:
+    """Get the text of a signature, as it is displayed to users.
+
+    The parsed pages are shared across the test session,
+    so the text of each signature is only extracted once.
+    """
+    sig = page.by_id[element_id]
     # Strip the anchor character off the end
-    result = soup.get_text()[:-1]
+    result = sig.text_content()[:-1]
     # Strip the leading newline character that doesn't get displayed to users
     result = result.strip()
-    # Condense double spaces created by HTML output quirks or `.get_text()` quirks
-    result = re.sub("  ", " ", result)
+    # Condense double spaces created by HTML output quirks
+    result = result.replace("  ", " ")
     return result
 
 
 class TestArguments:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("arguments")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
-
-    def test_multiple_arguments(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldA1")
-        assert signature_text(sig) == "fieldA1(arg1: type1, arg2: TestType): String"
-
-    def test_argument_fields(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldA1")
-        links = sig.parent.find("ul").find_all("li")
+    fixture_name = "arguments"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
+
+    def test_multiple_arguments(self, page: Page):
+        assert (
+            signature_text(page, "fieldA1")
+            == "fieldA1(arg1: type1, arg2: TestType): String"
+        )
+
+    def test_argument_fields(self, page: Page):
+        sig = page.by_id["fieldA1"]
+        links = sig.getparent().find(".//ul").findall(".//li")
         assert len(links) == 2
         enum_link, value_link = links
-        assert enum_link.get_text().startswith("arg1")
-        assert value_link.get_text().startswith("arg2")
+        assert enum_link.text_content().startswith("arg1")
+        assert value_link.text_content().startswith("arg2")
 
-    def test_type_is_linked(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldA1")
-        link = sig.a
-        assert link, "Argument type did not resolve to a valid hyperlink"
-        assert link.get_text() == "TestType"
+    def test_type_is_linked(self, page: Page):
+        sig = page.by_id["fieldA1"]
+        link = sig.find(".//a")
+        assert link is not None, "Argument type did not resolve to a valid hyperlink"
+        assert link.text_content() == "TestType"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldB1")
-        assert signature_text(sig) == "fieldB1(arg1: type1 @directiveA1): String"
+    def test_with_directive(self, page: Page):
+        assert (
+            signature_text(page, "fieldB1")
+            == "fieldB1(arg1: type1 @directiveA1): String"
+        )
 
-    def test_with_directive_const_arguments(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldB2")
+    def test_with_directive_const_arguments(self, page: Page):
         assert (
-            signature_text(sig)
+            signature_text(page, "fieldB2")
             == "fieldB2(arg1: type1 @directiveA1(arg1: 1, arg2: 2)): String"
         )
 
-    def test_directive_is_linked(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldB1")
-        link = sig.a
-        assert link, "Argument directive did not resolve to a valid hyperlink"
-        assert link.get_text() == "directiveA1"
-
-    def test_with_default_int_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC1")
-        assert signature_text(sig) == "fieldC1(arg1: type1 = 600): String"
-
-    def test_with_default_float_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC2")
-        assert signature_text(sig) == "fieldC2(arg1: type1 = 1.5): String"
-
-    def test_with_default_string_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC3")
-        assert signature_text(sig) == 'fieldC3(arg1: type1 = "mystring"): String'
-
-    def test_with_default_boolean_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC4")
-        assert signature_text(sig) == "fieldC4(arg1: type1 = true): String"
-
-    def test_with_default_null_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC5")
-        assert signature_text(sig) == "fieldC5(arg1: type1 = null): String"
-
-    def test_with_default_enum_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC6")
-        assert signature_text(sig) == "fieldC6(arg1: type1 = ENUMVALUE): String"
-
-    def test_with_default_list_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC7")
-        assert signature_text(sig) == "fieldC7(arg1: type1 = [1, 2]): String"
-
-    def test_with_default_object_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldC8")
-        assert signature_text(sig) == "fieldC8(arg1: type1 = {one: 1, two: 2}): String"
-
-    def test_with_list_type(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldD1")
-        assert signature_text(sig) == "fieldD1(arg1: [TestType]): String"
-        link = sig.a
-        assert link, "Nested type did not resolve to a valid hyperlink"
-        assert link.get_text() == "TestType"
-
-    def test_with_non_null_type(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldD2")
-        assert signature_text(sig) == "fieldD2(arg1: TestType!): String"
-        link = sig.a
-        assert link, "Non-null type did not resolve to a valid hyperlink"
-        assert link.get_text() == "TestType"
-
-    def test_with_list_type_non_null_values(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="fieldD3")
-        assert signature_text(sig) == "fieldD3(arg1: [TestType!]): String"
-        link = sig.a
-        assert link, "Nested non-null type did not resolve to a valid hyperlink"
-        assert link.get_text() == "TestType"
+    def test_directive_is_linked(self, page: Page):
+        sig = page.by_id["fieldB1"]
+        link = sig.find(".//a")
+        assert (
+            link is not None
+        ), "Argument directive did not resolve to a valid hyperlink"
+        assert link.text_content() == "directiveA1"
+
+    def test_with_default_int_value(self, page: Page):
+        assert signature_text(page, "fieldC1") == "fieldC1(arg1: type1 = 600): String"
+
+    def test_with_default_float_value(self, page: Page):
+        assert signature_text(page, "fieldC2") == "fieldC2(arg1: type1 = 1.5): String"
+
+    def test_with_default_string_value(self, page: Page):
+        assert (
+            signature_text(page, "fieldC3")
+            == 'fieldC3(arg1: type1 = "mystring"): String'
+        )
+
+    def test_with_default_boolean_value(self, page: Page):
+        assert signature_text(page, "fieldC4") == "fieldC4(arg1: type1 = true): String"
+
+    def test_with_default_null_value(self, page: Page):
+        assert signature_text(page, "fieldC5") == "fieldC5(arg1: type1 = null): String"
+
+    def test_with_default_enum_value(self, page: Page):
+        assert (
+            signature_text(page, "fieldC6")
+            == "fieldC6(arg1: type1 = ENUMVALUE): String"
+        )
+
+    def test_with_default_list_value(self, page: Page):
+        assert (
+            signature_text(page, "fieldC7") == "fieldC7(arg1: type1 = [1, 2]): String"
+        )
+
+    def test_with_default_object_value(self, page: Page):
+        assert (
+            signature_text(page, "fieldC8")
+            == "fieldC8(arg1: type1 = {one: 1, two: 2}): String"
+        )
+
+    def test_with_list_type(self, page: Page):
+        sig = page.by_id["fieldD1"]
+        assert signature_text(page, "fieldD1") == "fieldD1(arg1: [TestType]): String"
+        link = sig.find(".//a")
+        assert link is not None, "Nested type did not resolve to a valid hyperlink"
+        assert link.text_content() == "TestType"
+
+    def test_with_non_null_type(self, page: Page):
+        sig = page.by_id["fieldD2"]
+        assert signature_text(page, "fieldD2") == "fieldD2(arg1: TestType!): String"
+        link = sig.find(".//a")
+        assert link is not None, "Non-null type did not resolve to a valid hyperlink"
+        assert link.text_content() == "TestType"
+
+    def test_with_list_type_non_null_values(self, page: Page):
+        sig = page.by_id["fieldD3"]
+        assert signature_text(page, "fieldD3") == "fieldD3(arg1: [TestType!]): String"
+        link = sig.find(".//a")
+        assert (
+            link is not None
+        ), "Nested non-null type did not resolve to a valid hyperlink"
+        assert link.text_content() == "TestType"
 
 
 class TestDirectives:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("directives")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
-
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="directive1")
-        assert signature_text(sig) == "directive @directive1 on SCHEMA"
-
-    def test_multi_location(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="directive2")
+    fixture_name = "directives"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
+
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "directive1") == "directive @directive1 on SCHEMA"
+
+    def test_multi_location(self, page: Page):
         assert (
-            signature_text(sig)
+            signature_text(page, "directive2")
             == "directive @directive2 on FIELD_DEFINITION | ARGUMENT_DEFINITION"
         )
 
-    def test_with_argument(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="directive3")
-        assert signature_text(sig) == "directive @directive3(arg1: type1) on SCALAR"
+    def test_with_argument(self, page: Page):
+        sig = page.by_id["directive3"]
+        assert (
+            signature_text(page, "directive3")
+            == "directive @directive3(arg1: type1) on SCALAR"
+        )
 
-        fields = sig.parent.find("ul").find_all("li")
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 1
         field = fields[0]
-        assert field.get_text().startswith("arg1")
+        assert field.text_content().startswith("arg1")
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 1
         link = links[0]
-        assert link.get_text() == "directive1"
+        assert link.text_content() == "directive1"
 
 
 class TestEnums:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("enums")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
+    fixture_name = "enums"
 
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="enum1")
-        assert signature_text(sig) == "enum enum1"
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
 
-        sig = soup.find(id="enum1.value1")
-        assert signature_text(sig) == "value1"
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "enum1") == "enum enum1"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="enum2")
-        assert signature_text(sig) == "enum enum2 @deprecated"
+        assert signature_text(page, "enum1.value1") == "value1"
 
-        sig = soup.find(id="enum2.value1")
-        assert signature_text(sig) == "value1 @deprecated"
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "enum2") == "enum enum2 @deprecated"
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+        assert signature_text(page, "enum2.value1") == "value1 @deprecated"
+
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 2
         enum_link, value_link = links
-        assert enum_link.get_text() == "enum1"
-        assert value_link.get_text() == "enum1.value1"
+        assert enum_link.text_content() == "enum1"
+        assert value_link.text_content() == "enum1.value1"
+
+
+class TestIndex:
+    @pytest.fixture(scope="session")
+    def page(self, tmp_path_factory):
+        """Build every fixture as one project, reading the documents in parallel.
+
+        This is not cached so that the parallel read,
+        and the merging of the domain data from each worker,
+        happen on every run.
+        """
+        fixtures_dir = (pathlib.Path("tests") / "fixtures").resolve()
+        dest = tmp_path_factory.mktemp("index")
+        rebuild(
+            srcdir=str(fixtures_dir),
+            confdir=str(fixtures_dir),
+            outdir=str(dest / "html"),
+            doctreedir=str(dest / ".doctrees"),
+            parallel=2,
+        )
+        return Page(dest / "html" / "gql-index.html")
+
+    def entries(self, page: Page):
+        return [
+            entry.text_content()
+            for entry in page.root.iterfind(".//table[@class='domainindex-table']//a")
+        ]
+
+    def test_objects_from_every_document(self, page: Page):
+        entries = self.entries(page)
+        for fullname in (
+            "directive1",
+            "enum1",
+            "input1",
+            "interface1",
+            "scalar1",
+            "schema1",
+            "type1",
+            "union1",
+        ):
+            assert fullname in entries
+
+    def test_child_objects_excluded(self, page: Page):
+        entries = self.entries(page)
+        for fullname in (
+            "enum1.value1",
+            "input1.field1",
+            "interface1.field1",
+            "type1.field1",
+        ):
+            assert fullname not in entries
 
 
 class TestInputs:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("inputs")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
+    fixture_name = "inputs"
 
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="input1")
-        assert signature_text(sig) == "input input1"
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
 
-        sig = soup.find(id="input1.field1")
-        assert signature_text(sig) == "field1: Float"
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "input1") == "input input1"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="input2")
-        assert signature_text(sig) == "input input2 @deprecated"
+        assert signature_text(page, "input1.field1") == "field1: Float"
 
-        sig = soup.find(id="input2.field1")
-        assert signature_text(sig) == "field1: Int @deprecated"
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "input2") == "input input2 @deprecated"
 
-    def test_with_default_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="input2.field2")
-        assert signature_text(sig) == 'field2: String = "defaultvaluefield2"'
+        assert signature_text(page, "input2.field1") == "field1: Int @deprecated"
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    def test_with_default_value(self, page: Page):
+        assert (
+            signature_text(page, "input2.field2")
+            == 'field2: String = "defaultvaluefield2"'
+        )
+
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 2
         input_link, field_link = links
-        assert input_link.get_text() == "input1"
-        assert field_link.get_text() == "input1.field1"
+        assert input_link.text_content() == "input1"
+        assert field_link.text_content() == "input1.field1"
 
 
 class TestInterfaces:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("interfaces")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
+    fixture_name = "interfaces"
 
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="interface1")
-        assert signature_text(sig) == "interface interface1"
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
 
-        sig = soup.find(id="interface1.field1")
-        assert signature_text(sig) == "field1: String"
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "interface1") == "interface interface1"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="interface2")
-        assert signature_text(sig) == "interface interface2 @deprecated"
+        assert signature_text(page, "interface1.field1") == "field1: String"
 
-        sig = soup.find(id="interface2.field1")
-        assert signature_text(sig) == "field1: Int @deprecated"
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "interface2") == "interface interface2 @deprecated"
 
-    def test_with_default_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="interface2.field2")
-        assert signature_text(sig) == "field2(arg1: Int = 0): String"
+        assert signature_text(page, "interface2.field1") == "field1: Int @deprecated"
 
-        fields = sig.parent.find("ul").find_all("li")
+    def test_with_default_value(self, page: Page):
+        sig = page.by_id["interface2.field2"]
+        assert (
+            signature_text(page, "interface2.field2") == "field2(arg1: Int = 0): String"
+        )
+
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 1
         field = fields[0]
-        assert field.get_text().startswith("arg1")
+        assert field.text_content().startswith("arg1")
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 2
         input_link, field_link = links
-        assert input_link.get_text() == "interface1"
-        assert field_link.get_text() == "interface1.field1"
+        assert input_link.text_content() == "interface1"
+        assert field_link.text_content() == "interface1.field1"
 
 
 class TestScalars:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("scalars")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
-
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="scalar1")
-        assert signature_text(sig) == "scalar scalar1"
-
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="scalar2")
-        assert signature_text(sig) == "scalar scalar2 @deprecated"
-
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    fixture_name = "scalars"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
+
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "scalar1") == "scalar scalar1"
+
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "scalar2") == "scalar scalar2 @deprecated"
+
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 1
         link = links[0]
-        assert link.get_text() == "scalar1"
+        assert link.text_content() == "scalar1"
 
 
 class TestSchemas:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("schemas")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
+    fixture_name = "schemas"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
 
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="schema1")
-        assert signature_text(sig) == "schema"
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "schema1") == "schema"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="schema2")
-        assert signature_text(sig) == "schema @directive1 @directive2"
+    def test_with_directive(self, page: Page):
+        sig = page.by_id["schema2"]
+        assert signature_text(page, "schema2") == "schema @directive1 @directive2"
 
-        fields = sig.parent.find("ul").find_all("li")
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 3
         query_field, mutation_field, subscription_field = fields
-        assert query_field.get_text().startswith("query")
-        assert query_field.find("a").get_text() == "MyQueryRootType1"
-        assert mutation_field.get_text().startswith("mutation")
-        assert mutation_field.find("a").get_text() == "MyMutationRootType1"
-        assert subscription_field.get_text().startswith("subscription")
-        assert subscription_field.find("a").get_text() == "MySubscriptionRootType1"
+        assert query_field.text_content().startswith("query")
+        assert query_field.find(".//a").text_content() == "MyQueryRootType1"
+        assert mutation_field.text_content().startswith("mutation")
+        assert mutation_field.find(".//a").text_content() == "MyMutationRootType1"
+        assert subscription_field.text_content().startswith("subscription")
+        assert (
+            subscription_field.find(".//a").text_content() == "MySubscriptionRootType1"
+        )
 
-    def test_with_default_optypes(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="schema3")
+    def test_with_default_optypes(self, page: Page):
+        sig = page.by_id["schema3"]
 
-        fields = sig.parent.find("ul").find_all("li")
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 3
         query_field, mutation_field, subscription_field = fields
-        assert query_field.get_text().startswith("query")
-        assert query_field.find("span").get_text() == "Query"
-        assert mutation_field.get_text().startswith("mutation")
-        assert mutation_field.find("span").get_text() == "Mutation"
-        assert subscription_field.get_text().startswith("subscription")
-        assert subscription_field.find("span").get_text() == "Subscription"
+        assert query_field.text_content().startswith("query")
+        assert query_field.find(".//span").text_content() == "Query"
+        assert mutation_field.text_content().startswith("mutation")
+        assert mutation_field.find(".//span").text_content() == "Mutation"
+        assert subscription_field.text_content().startswith("subscription")
+        assert subscription_field.find(".//span").text_content() == "Subscription"
 
-    def test_as_parent(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="schema4")
+    def test_as_parent(self, page: Page):
+        sig = page.by_id["schema4"]
 
-        type_sig = soup.find(id="schema4.MyQueryRootType2")
-        assert signature_text(type_sig) == "type MyQueryRootType2"
+        assert (
+            signature_text(page, "schema4.MyQueryRootType2") == "type MyQueryRootType2"
+        )
 
-        fields = sig.parent.find("ul").find_all("li")
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 2
         query_field, mutation_field = fields
-        assert query_field.get_text().startswith("query")
-        assert query_field.find("a").get_text() == "MyQueryRootType2"
-        assert mutation_field.get_text().startswith("mutation")
-        assert mutation_field.find("a").get_text() == "schema4.MyMutationRootType2"
+        assert query_field.text_content().startswith("query")
+        assert query_field.find(".//a").text_content() == "MyQueryRootType2"
+        assert mutation_field.text_content().startswith("mutation")
+        assert (
+            mutation_field.find(".//a").text_content() == "schema4.MyMutationRootType2"
+        )
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 1
         link = links[0]
-        assert link.get_text() == "schema1"
+        assert link.text_content() == "schema1"
 
-    def test_role_resolution(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="role-resolution").find_all("a", "reference")
+    def test_role_resolution(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["role-resolution"])
         assert len(links) == 7
         default_roles = links[:4]
-        assert all(role.get_text() == "MyType2" for role in default_roles)
-        assert links[4].get_text() == "RoleType2"
+        assert all(role.text_content() == "MyType2" for role in default_roles)
+        assert links[4].text_content() == "RoleType2"
         named_roles = links[5:]
-        assert all(role.get_text() == "roleschema1.RoleType2" for role in named_roles)
+        assert all(
+            role.text_content() == "roleschema1.RoleType2" for role in named_roles
+        )
+
+    def test_role_resolution_prefers_schema(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["schema-scoped-resolution"])
+        assert len(links) == 1
+        link = links[0]
+        assert link.text_content() == "ScopedType2"
+        assert link.get("href").endswith("#scopedschema1.ScopedType2")
 
 
 class TestTypeObjects:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("type_objects")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
+    fixture_name = "type_objects"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
 
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="type1")
-        assert signature_text(sig) == "type type1"
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "type1") == "type type1"
 
-        sig = soup.find(id="type1.field1")
-        assert signature_text(sig) == "field1: Int"
+        assert signature_text(page, "type1.field1") == "field1: Int"
 
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="type2")
-        assert signature_text(sig) == "type type2 @deprecated"
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "type2") == "type type2 @deprecated"
 
-        sig = soup.find(id="type2.field1")
-        assert signature_text(sig) == "field1: Int @deprecated"
+        assert signature_text(page, "type2.field1") == "field1: Int @deprecated"
 
-    def test_with_default_value(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="type2.field2")
-        assert signature_text(sig) == "field2(arg1: Int = 0): String"
+    def test_with_default_value(self, page: Page):
+        sig = page.by_id["type2.field2"]
+        assert signature_text(page, "type2.field2") == "field2(arg1: Int = 0): String"
 
-        fields = sig.parent.find("ul").find_all("li")
+        fields = sig.getparent().find(".//ul").findall(".//li")
         assert len(fields) == 1
         field = fields[0]
-        assert field.get_text().startswith("arg1")
+        assert field.text_content().startswith("arg1")
 
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 2
         input_link, field_link = links
-        assert input_link.get_text() == "type1"
-        assert field_link.get_text() == "type1.field1"
+        assert input_link.text_content() == "type1"
+        assert field_link.text_content() == "type1.field1"
 
 
 class TestUnions:
-    @pytest.fixture(scope="class")
-    def soup(self, builder):
-        builder("unions")
-        with (pathlib.Path("_build") / "html" / "index.html").open() as in_f:
-            return bs4.BeautifulSoup(in_f, "html.parser")
-
-    def test_simple_parse(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="union1")
-        assert signature_text(sig) == "union union1 = Int"
-
-    def test_with_multiple_member_types(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="union2")
-        assert signature_text(sig) == "union union2 = union1 | String"
-
-    def test_links_member_types(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="union2")
-        link = sig.a
-        assert link, "Nested type did not resolve to a valid hyperlink"
-        assert link.get_text() == "union1"
-
-    def test_with_directive(self, soup: bs4.BeautifulSoup):
-        sig = soup.find(id="union3")
-        assert signature_text(sig) == "union union3 @deprecated = Int"
-
-    def test_role(self, soup: bs4.BeautifulSoup):
-        links = soup.find(id="roles").find_all("a", "reference")
+    fixture_name = "unions"
+
+    @pytest.fixture(scope="session")
+    def page(self, builder):
+        dest = builder(self.fixture_name)
+        return Page(dest / "_build" / "html" / "index.html")
+
+    def test_simple_parse(self, page: Page):
+        assert signature_text(page, "union1") == "union union1 = Int"
+
+    def test_with_multiple_member_types(self, page: Page):
+        assert signature_text(page, "union2") == "union union2 = union1 | String"
+
+    def test_links_member_types(self, page: Page):
+        sig = page.by_id["union2"]
+        link = sig.find(".//a")
+        assert link is not None, "Nested type did not resolve to a valid hyperlink"
+        assert link.text_content() == "union1"
+
+    def test_with_directive(self, page: Page):
+        assert signature_text(page, "union3") == "union union3 @deprecated = Int"
+
+    def test_role(self, page: Page):
+        links = REFERENCE_LINKS(page.by_id["roles"])
         assert len(links) == 1
         link = links[0]
-        assert link.get_text() == "union1"
+        assert link.text_content() == "union1"